@@ -1,11 +1,41 @@
 import os
-import random
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, ForeignKey, or_
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy import (
+    bindparam,
+    create_engine,
+    delete,
+    event,
+    func,
+    lambda_stmt,
+    select,
+    text,
+    update,
+    Column,
+    Index,
+    Integer,
+    String,
+    ForeignKey,
+    or_,
+)
+from sqlalchemy.orm import (
+    sessionmaker,
+    relationship,
+    scoped_session,
+    selectinload,
+    raiseload,
+    deferred,
+    undefer,
+)
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.ext.declarative import declarative_base
 from passlib.context import CryptContext
+from cachetools import TTLCache
 from flask_login import (
     LoginManager,
     UserMixin,
@@ -19,10 +49,80 @@ from flask_login import (
 # Налаштування бази даних та конфігурація
 # -----------------------------------------------------------------------------
 
-engine = create_engine("sqlite:///linguist.db")
+engine = create_engine(
+    "sqlite:///linguist.db",
+    poolclass=QueuePool,
+    pool_size=5,
+    max_overflow=10,
+    pool_pre_ping=True,
+    insertmanyvalues_page_size=1000,
+    connect_args={"check_same_thread": False},
+)
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Налаштовує кожне нове з'єднання SQLite.
+
+    WAL дозволяє читачам працювати паралельно з одним писарем, а
+    synchronous=NORMAL прибирає другий fsync на кожен commit. mmap та
+    більший page-кеш скорочують системні виклики на шляхах читання.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
+
 Base = declarative_base()
-Session = sessionmaker(bind=engine)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# expire_on_commit=False: об'єкти лишаються читабельними після завершення
+# сесії, зокрема користувачі, закешовані для load_user.
+Session = sessionmaker(bind=engine, expire_on_commit=False)
+# Сесія на рівні запиту: всі виклики в межах одного запиту ділять одну сесію,
+# яка закривається в teardown_appcontext.
+db_session = scoped_session(Session)
+
+# Короткоживучий кеш для load_user: прибирає повторний SELECT користувача
+# на кожному @login_required-запиті. Інвалідовується при зміні чи видаленні
+# користувача.
+_user_cache = TTLCache(maxsize=1024, ttl=30)
+# Вартість bcrypt параметризовано через оточення: у dev/CI можна поставити
+# BCRYPT_ROUNDS=4 (мінімум), що здешевлює кожен хеш у ~256 разів проти
+# типових 12 раундів у production.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    bcrypt__rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+    deprecated="auto",
+)
+
+# Bcrypt навантажує процесор на ~100-300 мс за один хеш. Виносимо KDF в окремі
+# процеси, щоб робочий потік Flask не блокував інші запити під час реєстрації
+# чи входу. Процеси створюються ліниво — при першому submit.
+hash_executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
+def _hash_password(password):
+    return pwd_context.hash(password)
+
+
+def _verify_password(password, hashed):
+    return pwd_context.verify(password, hashed)
+
+
+def hash_password(password):
+    """Хешує пароль у пулі процесів поза основним інтерпретатором."""
+    return hash_executor.submit(_hash_password, password).result()
+
+
+def verify_password(password, hashed):
+    """Перевіряє пароль у пулі процесів поза основним інтерпретатором."""
+    return hash_executor.submit(_verify_password, password, hashed).result()
+
+
+# Хеш-заглушка для входу з неіснуючим email: перевірка виконується завжди,
+# тож час відповіді не виказує, чи зареєстрована адреса.
+_DUMMY_HASH = pwd_context.hash("x" * 16)
 
 # -----------------------------------------------------------------------------
 # Моделі бази даних
@@ -39,27 +139,32 @@ class User(Base, UserMixin):
     cards = relationship("Card", back_populates="user", cascade="all, delete-orphan")
 
     def verify_password(self, password):
-        return pwd_context.verify(password, self.password)
+        return verify_password(password, self.password)
 
 
 class Deck(Base):
     __tablename__ = "decks"
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     user = relationship("User", back_populates="decks")
     cards = relationship("Card", back_populates="deck", cascade="all, delete-orphan")
 
 
 class Card(Base):
     __tablename__ = "cards"
+    # Композитний індекс обслуговує перевірки власності та вибірку карток
+    # конкретної колоди; B-tree-пошук замість повного сканування таблиці.
+    __table_args__ = (Index("ix_cards_user_deck", "user_id", "deck_id"),)
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     word = Column(String, nullable=False)
     translation = Column(String, nullable=False)
-    tip = Column(String)
+    # Відкладена колонка: запити, яким підказка не потрібна, не тягнуть її
+    # з бази; там, де вона рендериться, додаємо undefer().
+    tip = deferred(Column(String))
     user = relationship("User", back_populates="cards")
-    deck_id = Column(Integer, ForeignKey("decks.id"), nullable=True)
+    deck_id = Column(Integer, ForeignKey("decks.id"), nullable=True, index=True)
     deck = relationship("Deck", back_populates="cards")
 
     def to_dict(self):
@@ -72,42 +177,99 @@ class Card(Base):
         }
 
 
+# Індекс за виразом: точні та префіксні збіги без урахування регістру
+# зможуть використовувати його замість сканування.
+Index("ix_cards_word_lower", func.lower(Card.word))
+
+
+# Повнотекстовий індекс для пошуку карток: зовнішній вміст береться з таблиці
+# cards, а тригери тримають індекс синхронізованим із нею.
+FTS_SETUP_STATEMENTS = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(
+        word, translation, tip, content='cards', content_rowid='id'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS cards_fts_ai AFTER INSERT ON cards BEGIN
+        INSERT INTO cards_fts(rowid, word, translation, tip)
+        VALUES (new.id, new.word, new.translation, new.tip);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS cards_fts_ad AFTER DELETE ON cards BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, word, translation, tip)
+        VALUES ('delete', old.id, old.word, old.translation, old.tip);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS cards_fts_au AFTER UPDATE ON cards BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, word, translation, tip)
+        VALUES ('delete', old.id, old.word, old.translation, old.tip);
+        INSERT INTO cards_fts(rowid, word, translation, tip)
+        VALUES (new.id, new.word, new.translation, new.tip);
+    END""",
+]
+
+
 def setup_database():
-    """Створення таблиць бази даних та додавання тестових даних, якщо їх немає."""
+    """Створення таблиць бази даних та додавання тестових даних, якщо їх немає.
+
+    Функція ідемпотентна: увесь DDL має IF NOT EXISTS, тож її безпечно
+    викликати при кожному старті, зокрема над уже наповненою базою.
+    """
     Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # create_all пропускає вже наявні таблиці разом з їхніми індексами,
+        # тож для старих баз індекси дозастосовуємо окремо.
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                connection.execute(CreateIndex(index, if_not_exists=True))
+        fts_exists = (
+            connection.execute(
+                text(
+                    "SELECT 1 FROM sqlite_master "
+                    "WHERE type = 'table' AND name = 'cards_fts'"
+                )
+            ).first()
+            is not None
+        )
+        for statement in FTS_SETUP_STATEMENTS:
+            connection.execute(text(statement))
+        if not fts_exists:
+            # Тригери індексують лише нові зміни; картки, що існували до
+            # створення індексу, наповнюємо явною перебудовою.
+            connection.execute(
+                text("INSERT INTO cards_fts(cards_fts) VALUES('rebuild')")
+            )
     with Session() as session:
         existing_user = session.query(User).filter_by(name="Alice").first()
         if not existing_user:
+            # Усі тестові дані пишемо однією транзакцією: flush() видає
+            # автоінкрементні id без проміжних commit/refresh.
             user = User(
                 name="Alice",
                 email="alice@example.com",
-                password=pwd_context.hash("password123"),
+                password=hash_password("password123"),
             )
             session.add(user)
-            session.commit()
-            session.refresh(user)
+            session.flush()
 
             deck = Deck(name="General Vocabulary", user_id=user.id)
             session.add(deck)
-            session.commit()
-            session.refresh(deck)
-
-            card1 = Card(
-                user_id=user.id,
-                deck_id=deck.id,
-                word="hello",
-                translation="привіт",
-                tip="Привітання",
-            )
-            card2 = Card(
-                user_id=user.id,
-                deck_id=deck.id,
-                word="world",
-                translation="світ",
-                tip="Наша планета",
+            session.flush()
+
+            session.add_all(
+                [
+                    Card(
+                        user_id=user.id,
+                        deck_id=deck.id,
+                        word="hello",
+                        translation="привіт",
+                        tip="Привітання",
+                    ),
+                    Card(
+                        user_id=user.id,
+                        deck_id=deck.id,
+                        word="world",
+                        translation="світ",
+                        tip="Наша планета",
+                    ),
+                ]
             )
-            session.add(card1)
-            session.add(card2)
             session.commit()
 
 
@@ -116,170 +278,205 @@ def setup_database():
 # -----------------------------------------------------------------------------
 
 
-def user_create(name, email, password):
+def user_create(name, email, password, session=None):
     """Створює нового користувача."""
-    with Session() as session:
-        existing_user = session.query(User).filter_by(email=email).first()
-        if existing_user:
-            return None
-        hashed_password = pwd_context.hash(password)
-        new_user = User(name=name, email=email, password=hashed_password)
-        session.add(new_user)
-        session.commit()
-        session.refresh(new_user)
-        return new_user
+    session = session if session is not None else db_session()
+    existing_user = user_get_by_email(email, session=session)
+    if existing_user:
+        return None
+    hashed_password = hash_password(password)
+    new_user = User(name=name, email=email, password=hashed_password)
+    session.add(new_user)
+    session.commit()
+    return new_user
 
 
-def user_get_by_id(user_id):
+def user_get_by_id(user_id, session=None):
     """Отримує користувача за ID."""
-    with Session() as session:
-        return session.get(User, user_id)
+    session = session if session is not None else db_session()
+    return session.get(User, user_id)
 
 
-def user_get_by_email(email):
+def user_get_by_email(email, session=None):
     """Отримує користувача за email."""
-    with Session() as session:
-        return session.query(User).filter_by(email=email).first()
+    session = session if session is not None else db_session()
+    # lambda_stmt кешує скомпільований SQL: наступні виклики лише
+    # підставляють параметри, минаючи стадію компіляції Core.
+    stmt = lambda_stmt(lambda: select(User).where(User.email == bindparam("email")))
+    return session.execute(stmt, {"email": email}).scalar_one_or_none()
 
 
-def user_update_name(user_id, name):
+def user_update_name(user_id, name, session=None):
     """Оновлює ім'я користувача."""
-    with Session() as session:
-        user = session.get(User, user_id)
-        if user:
-            user.name = name
-            session.commit()
-            session.refresh(user)
-            return user
-        return None
+    session = session if session is not None else db_session()
+    user = session.get(User, user_id)
+    if user:
+        user.name = name
+        session.commit()
+        session.refresh(user)
+        _user_cache.pop(user_id, None)
+        return user
+    return None
 
 
-def user_change_password(user_id, old_password, new_password):
+def user_change_password(user_id, old_password, new_password, session=None):
     """Змінює пароль користувача."""
-    with Session() as session:
-        user = session.get(User, user_id)
-        if user and user.verify_password(old_password):
-            user.password = pwd_context.hash(new_password)
-            session.commit()
-            return True
-        return False
+    session = session if session is not None else db_session()
+    user = session.get(User, user_id)
+    if user and user.verify_password(old_password):
+        user.password = hash_password(new_password)
+        session.commit()
+        _user_cache.pop(user_id, None)
+        return True
+    return False
 
 
-def user_delete_by_id(user_id):
+def user_delete_by_id(user_id, session=None):
     """Видаляє користувача."""
-    with Session() as session:
-        user = session.get(User, user_id)
-        if user:
-            session.delete(user)
-            session.commit()
-            return True
-        return False
+    session = session if session is not None else db_session()
+    user = session.get(User, user_id)
+    if user:
+        session.delete(user)
+        session.commit()
+        _user_cache.pop(user_id, None)
+        return True
+    return False
 
 
-def deck_create(name, user_id):
+def deck_create(name, user_id, session=None):
     """Створює нову колоду."""
-    with Session() as session:
-        new_deck = Deck(name=name, user_id=user_id)
-        session.add(new_deck)
-        session.commit()
-        session.refresh(new_deck)
-        return new_deck
+    session = session if session is not None else db_session()
+    new_deck = Deck(name=name, user_id=user_id)
+    session.add(new_deck)
+    session.commit()
+    return new_deck
 
 
-def deck_get_by_id(deck_id):
+def deck_get_by_id(deck_id, session=None):
     """Отримує колоду за ID."""
-    with Session() as session:
-        return session.get(Deck, deck_id)
+    session = session if session is not None else db_session()
+    return session.get(Deck, deck_id)
 
 
-def deck_update(deck_id, name):
+def deck_update(deck_id, name, session=None):
     """Оновлює назву колоди."""
-    with Session() as session:
-        deck = session.get(Deck, deck_id)
-        if deck:
-            deck.name = name
-            session.commit()
-            session.refresh(deck)
-            return deck
-        return None
+    session = session if session is not None else db_session()
+    deck = session.get(Deck, deck_id)
+    if deck:
+        deck.name = name
+        session.commit()
+        session.refresh(deck)
+        return deck
+    return None
 
 
-def deck_delete_by_id(deck_id):
+def deck_delete_by_id(deck_id, session=None):
     """Видаляє колоду."""
-    with Session() as session:
-        deck = session.get(Deck, deck_id)
-        if deck:
-            session.delete(deck)
-            session.commit()
-            return True
-        return False
-
-
-def card_create(user_id, word, translation, tip, deck_id=None):
-    """Створює нову картку."""
-    with Session() as session:
-        new_card = Card(
-            user_id=user_id,
-            word=word,
-            translation=translation,
-            tip=tip,
-            deck_id=deck_id,
-        )
-        session.add(new_card)
+    session = session if session is not None else db_session()
+    deck = session.get(Deck, deck_id)
+    if deck:
+        session.delete(deck)
         session.commit()
-        session.refresh(new_card)
-        return new_card
+        return True
+    return False
 
 
-def card_get_by_id(card_id):
+def card_create(user_id, word, translation, tip, deck_id=None, session=None):
+    """Створює нову картку."""
+    session = session if session is not None else db_session()
+    new_card = Card(
+        user_id=user_id,
+        word=word,
+        translation=translation,
+        tip=tip,
+        deck_id=deck_id,
+    )
+    session.add(new_card)
+    session.commit()
+    return new_card
+
+
+def card_get_by_id(card_id, session=None):
     """Отримує картку за ID."""
-    with Session() as session:
-        return session.get(Card, card_id)
-
-
-def card_filter(sub_word):
-    """Фільтрує картки за словом, перекладом або підказкою."""
-    with Session() as session:
-        search_term = f"%{sub_word}%"
-        return (
-            session.query(Card)
-            .filter(
-                or_(
-                    Card.word.ilike(search_term),
-                    Card.translation.ilike(search_term),
-                    Card.tip.ilike(search_term),
+    session = session if session is not None else db_session()
+    return session.get(Card, card_id)
+
+
+def card_filter(sub_word, session=None):
+    """Фільтрує картки за словом, перекладом або підказкою.
+
+    Пошук виконується через повнотекстовий індекс cards_fts (префіксний
+    збіг по токенах), тож повного сканування таблиці не відбувається.
+    Якщо в запиті немає жодного токена, повертаємось до ILIKE.
+
+    Генератор: рядки віддаються порціями по 100 (yield_per), тому пікова
+    пам'ять пропорційна порції, а не всьому результату. Викликачі, яким
+    потрібен список, загортають виклик у list().
+    """
+    session = session if session is not None else db_session()
+    tokens = re.findall(r"\w+", sub_word)
+    if tokens:
+        match_query = " ".join(f'"{token}"*' for token in tokens)
+        # Пошук звіряється і з підказкою, тож undefer(Card.tip): SELECT c.*
+        # і так тягне колонку, без опції її було б відкинуто й довантажено
+        # ліниво на кожен рядок.
+        stmt = (
+            select(Card)
+            .from_statement(
+                text(
+                    "SELECT c.* FROM cards c "
+                    "JOIN cards_fts ON cards_fts.rowid = c.id "
+                    "WHERE cards_fts MATCH :q"
                 )
             )
-            .all()
+            .options(undefer(Card.tip))
+        )
+        yield from session.execute(
+            stmt, {"q": match_query}, execution_options={"yield_per": 100}
+        ).scalars()
+        return
+    stmt = lambda_stmt(
+        lambda: select(Card)
+        .where(
+            or_(
+                Card.word.ilike(bindparam("pattern")),
+                Card.translation.ilike(bindparam("pattern")),
+                Card.tip.ilike(bindparam("pattern")),
+            )
         )
+        .options(undefer(Card.tip))
+    )
+    yield from session.execute(
+        stmt, {"pattern": f"%{sub_word}%"}, execution_options={"yield_per": 100}
+    ).scalars()
 
 
-def card_update(card_id, word=None, translation=None, tip=None):
+def card_update(card_id, word=None, translation=None, tip=None, session=None):
     """Оновлює інформацію про картку."""
-    with Session() as session:
-        card = session.get(Card, card_id)
-        if card:
-            if word is not None:
-                card.word = word
-            if translation is not None:
-                card.translation = translation
-            if tip is not None:
-                card.tip = tip
-            session.commit()
-            session.refresh(card)
-            return card
-        return None
+    session = session if session is not None else db_session()
+    card = session.get(Card, card_id)
+    if card:
+        if word is not None:
+            card.word = word
+        if translation is not None:
+            card.translation = translation
+        if tip is not None:
+            card.tip = tip
+        session.commit()
+        session.refresh(card)
+        return card
+    return None
 
 
-def card_delete_by_id(card_id):
+def card_delete_by_id(card_id, session=None):
     """Видаляє картку."""
-    with Session() as session:
-        card = session.get(Card, card_id)
-        if card:
-            session.delete(card)
-            session.commit()
-            return True
-        return False
+    session = session if session is not None else db_session()
+    card = session.get(Card, card_id)
+    if card:
+        session.delete(card)
+        session.commit()
+        return True
+    return False
 
 
 # -----------------------------------------------------------------------------
@@ -292,6 +489,82 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = "login"
 
+
+@app.teardown_appcontext
+def shutdown_session(exception=None):
+    """Повертає сесію запиту до пулу після завершення обробки."""
+    db_session.remove()
+
+
+@contextmanager
+def count_queries():
+    """Збирає SQL-запити, виконані двигуном у межах блоку."""
+    queries = []
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        queries.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield queries
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+
+
+def bounded_queries(expected):
+    """Обмежує кількість запитів для маршруту в debug-режимі.
+
+    Якщо обробник виконує більше ніж `expected` запитів (наприклад, новий
+    доступ у шаблоні додав ліниве завантаження), порушення логуються разом
+    із SQL-текстом і маршрут падає з AssertionError під час розробки.
+    У production-режимі декоратор нічого не робить.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not app.debug:
+                return view(*args, **kwargs)
+            with count_queries() as queries:
+                response = view(*args, **kwargs)
+            if len(queries) > expected:
+                for statement in queries:
+                    app.logger.warning(
+                        "Запит у %s (очікувалось не більше %d): %s",
+                        view.__name__,
+                        expected,
+                        statement,
+                    )
+            assert len(queries) <= expected, (
+                f"{view.__name__} виконав {len(queries)} запитів, "
+                f"очікувалось не більше {expected}"
+            )
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _deck_with_cards(session, deck_id):
+    """Завантажує колоду разом із картками одним додатковим SELECT.
+
+    selectinload уникає дублювання рядків Deck, яке дав би joinedload для
+    зв'язку один-до-багатьох. У debug-режимі raiseload("*") перетворює
+    будь-яке ненавмисне ліниве завантаження на помилку.
+    """
+    # cards.html показує підказку, тому undefer(Card.tip) — інакше кожна
+    # картка довантажувала б її окремим SELECT.
+    stmt = (
+        select(Deck)
+        .options(selectinload(Deck.cards).undefer(Card.tip))
+        .where(Deck.id == deck_id)
+    )
+    if app.debug:
+        stmt = stmt.options(raiseload("*"))
+    return session.execute(stmt).scalar_one_or_none()
+
+
 @app.context_processor
 def inject_datetime():
     """Додає об'єкт datetime до всіх шаблонів."""
@@ -300,16 +573,29 @@ def inject_datetime():
 
 @login_manager.user_loader
 def load_user(user_id):
-    with Session() as session:
-        return session.get(User, int(user_id))
+    user_id = int(user_id)
+    user = _user_cache.get(user_id)
+    if user is None:
+        user = db_session().get(User, user_id)
+        if user is not None:
+            _user_cache[user_id] = user
+    return user
 
 
 @app.route("/")
 @login_required
+@bounded_queries(2)
 def index():
-    with Session() as session:
-        user_decks = session.query(Deck).filter_by(user_id=current_user.id).all()
-        return render_template("decks.html", decks=user_decks)
+    session = db_session()
+    # decks.html показує кількість карток (deck.cards|length), тому картки
+    # завантажуємо одним selectinload замість лінивого SELECT на колоду.
+    stmt = lambda_stmt(
+        lambda: select(Deck)
+        .options(selectinload(Deck.cards))
+        .where(Deck.user_id == bindparam("user_id"))
+    )
+    user_decks = session.execute(stmt, {"user_id": current_user.id}).scalars().all()
+    return render_template("decks.html", decks=user_decks)
 
 
 @app.route("/register", methods=["GET", "POST"])
@@ -343,8 +629,10 @@ def login():
         email = request.form.get("email")
         password = request.form.get("password")
         user = user_get_by_email(email)
+        stored_hash = user.password if user else _DUMMY_HASH
+        password_ok = verify_password(password, stored_hash)
 
-        if user and user.verify_password(password):
+        if user and password_ok:
             login_user(user)
             flash("Ви успішно увійшли!", "success")
             return redirect(url_for("index"))
@@ -364,13 +652,14 @@ def logout():
 
 @app.route("/deck/<int:deck_id>")
 @login_required
+@bounded_queries(2)
 def show_cards_in_deck(deck_id):
-    with Session() as session:
-        deck = session.get(Deck, deck_id)
-        if not deck or deck.user_id != current_user.id:
-            flash("Колоду не знайдено або у вас немає доступу.", "danger")
-            return redirect(url_for("index"))
-        return render_template("cards.html", deck=deck, cards=deck.cards)
+    session = db_session()
+    deck = _deck_with_cards(session, deck_id)
+    if not deck or deck.user_id != current_user.id:
+        flash("Колоду не знайдено або у вас немає доступу.", "danger")
+        return redirect(url_for("index"))
+    return render_template("cards.html", deck=deck, cards=deck.cards)
 
 
 @app.route("/add_card/<int:deck_id>", methods=["POST"])
@@ -380,23 +669,24 @@ def add_card_to_deck(deck_id):
     translation = request.form["translation"]
     tip = request.form.get("tip")
 
-    with Session() as session:
-        deck = session.get(Deck, deck_id)
-        if not deck or deck.user_id != current_user.id:
-            flash("Колоду не знайдено або у вас немає доступу.", "danger")
-            return redirect(url_for("index"))
-        
-        if word and translation:
-            card_create(
-                user_id=current_user.id,
-                word=word,
-                translation=translation,
-                tip=tip,
-                deck_id=deck_id,
-            )
-            flash("Картку додано успішно!", "success")
-        else:
-            flash("Помилка: слово та переклад є обов'язковими.", "danger")
+    session = db_session()
+    deck = session.get(Deck, deck_id)
+    if not deck or deck.user_id != current_user.id:
+        flash("Колоду не знайдено або у вас немає доступу.", "danger")
+        return redirect(url_for("index"))
+
+    if word and translation:
+        card_create(
+            user_id=current_user.id,
+            word=word,
+            translation=translation,
+            tip=tip,
+            deck_id=deck_id,
+            session=session,
+        )
+        flash("Картку додано успішно!", "success")
+    else:
+        flash("Помилка: слово та переклад є обов'язковими.", "danger")
 
     return redirect(url_for("show_cards_in_deck", deck_id=deck_id))
 
@@ -404,12 +694,12 @@ def add_card_to_deck(deck_id):
 @app.route("/edit_card/<int:card_id>")
 @login_required
 def edit_card(card_id):
-    with Session() as session:
-        card = session.get(Card, card_id)
-        if not card or card.user_id != current_user.id:
-            flash("Картку не знайдено або у вас немає доступу.", "danger")
-            return redirect(url_for("index"))
-        return render_template("edit_card.html", card=card)
+    session = db_session()
+    card = session.get(Card, card_id, options=(undefer(Card.tip),))
+    if not card or card.user_id != current_user.id:
+        flash("Картку не знайдено або у вас немає доступу.", "danger")
+        return redirect(url_for("index"))
+    return render_template("edit_card.html", card=card)
 
 
 @app.route("/update_card/<int:card_id>", methods=["POST"])
@@ -419,30 +709,57 @@ def update_card(card_id):
     translation = request.form.get("translation")
     tip = request.form.get("tip")
 
-    with Session() as session:
-        card = session.get(Card, card_id)
-        if not card or card.user_id != current_user.id:
-            flash("Картку не знайдено або у вас немає доступу.", "danger")
-            return redirect(url_for("index"))
-        
-        card_update(card_id, word=word, translation=translation, tip=tip)
-        flash("Картку оновлено успішно!", "success")
-        return redirect(url_for("show_cards_in_deck", deck_id=card.deck_id))
+    # Авторизація та оновлення одним UPDATE: умова user_id у WHERE замінює
+    # попередній SELECT-перевірку власності, а RETURNING віддає deck_id
+    # для редиректу без додаткового запиту.
+    values = {
+        key: value
+        for key, value in (("word", word), ("translation", translation), ("tip", tip))
+        if value is not None
+    }
+    session = db_session()
+    if not values:
+        # Порожній UPDATE не скомпілюється; без полів лише перевіряємо
+        # власність і повертаємось до колоди.
+        row = session.execute(
+            select(Card.deck_id).where(
+                Card.id == card_id, Card.user_id == current_user.id
+            )
+        ).first()
+    else:
+        row = session.execute(
+            update(Card)
+            .where(Card.id == card_id, Card.user_id == current_user.id)
+            .values(**values)
+            .returning(Card.deck_id)
+        ).first()
+    if row is None:
+        session.rollback()
+        flash("Картку не знайдено або у вас немає доступу.", "danger")
+        return redirect(url_for("index"))
+
+    session.commit()
+    flash("Картку оновлено успішно!", "success")
+    return redirect(url_for("show_cards_in_deck", deck_id=row.deck_id))
 
 
 @app.route("/delete_card/<int:card_id>", methods=["POST"])
 @login_required
 def delete_card(card_id):
-    with Session() as session:
-        card = session.get(Card, card_id)
-        if not card or card.user_id != current_user.id:
-            flash("Картку не знайдено або у вас немає доступу.", "danger")
-            return redirect(url_for("index"))
-        
-        deck_id = card.deck_id
-        card_delete_by_id(card_id)
-        flash("Картку видалено успішно!", "success")
-        return redirect(url_for("show_cards_in_deck", deck_id=deck_id))
+    session = db_session()
+    row = session.execute(
+        delete(Card)
+        .where(Card.id == card_id, Card.user_id == current_user.id)
+        .returning(Card.deck_id)
+    ).first()
+    if row is None:
+        session.rollback()
+        flash("Картку не знайдено або у вас немає доступу.", "danger")
+        return redirect(url_for("index"))
+
+    session.commit()
+    flash("Картку видалено успішно!", "success")
+    return redirect(url_for("show_cards_in_deck", deck_id=row.deck_id))
 
 
 @app.route("/add_deck", methods=["POST"])
@@ -460,33 +777,52 @@ def add_deck():
 @app.route("/delete_deck/<int:deck_id>", methods=["POST"])
 @login_required
 def delete_deck(deck_id):
-    with Session() as session:
-        deck = session.get(Deck, deck_id)
-        if not deck or deck.user_id != current_user.id:
-            flash("Колоду не знайдено або у вас немає доступу.", "danger")
-            return redirect(url_for("index"))
-        
-        deck_delete_by_id(deck_id)
-        flash("Колоду та всі картки в ній видалено успішно!", "success")
+    session = db_session()
+    result = session.execute(
+        delete(Deck).where(Deck.id == deck_id, Deck.user_id == current_user.id)
+    )
+    if result.rowcount == 0:
+        session.rollback()
+        flash("Колоду не знайдено або у вас немає доступу.", "danger")
+        return redirect(url_for("index"))
+
+    # ORM-каскад deck.cards не спрацьовує для Core-delete, тому картки
+    # колоди видаляємо явно в тій самій транзакції.
+    session.execute(delete(Card).where(Card.deck_id == deck_id))
+    session.commit()
+    flash("Колоду та всі картки в ній видалено успішно!", "success")
     return redirect(url_for("index"))
 
 
 @app.route("/review/<int:deck_id>")
 @login_required
+@bounded_queries(2)
 def review_deck(deck_id):
-    with Session() as session:
-        deck = session.get(Deck, deck_id)
-        if not deck or deck.user_id != current_user.id:
-            flash("Колоду не знайдено або у вас немає доступу.", "danger")
-            return redirect(url_for("index"))
-        
-        # Перетворюємо об'єкти Card на словники, щоб Jinja2 міг їх обробити
-        cards = [card.to_dict() for card in deck.cards]
-        random.shuffle(cards)  # Перемішуємо картки для практики
-        return render_template("review.html", deck=deck, cards=cards)
+    session = db_session()
+    deck = session.get(Deck, deck_id)
+    if not deck or deck.user_id != current_user.id:
+        flash("Колоду не знайдено або у вас немає доступу.", "danger")
+        return redirect(url_for("index"))
+
+    # Перемішування та обмеження вибірки виконує сама база: з колоди на
+    # 1000 карток при limit=20 до Python потрапляють лише 20 рядків.
+    # dict() замість гідратації ORM-об'єктів — шаблон серіалізує картки
+    # через tojson.
+    limit = request.args.get("limit", 20, type=int)
+    cards = [
+        dict(row)
+        for row in session.execute(
+            select(Card.id, Card.word, Card.translation, Card.tip)
+            .where(Card.deck_id == deck_id)
+            .order_by(func.random())
+            .limit(limit)
+        ).mappings()
+    ]
+    return render_template("review.html", deck=deck, cards=cards)
 
 
 if __name__ == "__main__":
-    if not os.path.exists("linguist.db"):
-        setup_database()
+    # setup_database ідемпотентна: для існуючої бази вона лише дозастосовує
+    # нові індекси та FTS-DDL, нічого не пересіюючи.
+    setup_database()
     app.run(debug=True)
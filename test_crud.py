@@ -13,7 +13,13 @@ import shutil
 engine = create_engine("sqlite:///linguist_test.db")
 Base = declarative_base()
 Session = sessionmaker(bind=engine)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Мінімальна вартість bcrypt: тести не перевіряють стійкість хешу.
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    bcrypt__rounds=int(os.getenv("BCRYPT_ROUNDS", "12")),
+    deprecated="auto",
+)
 
 
 # -----------------------------------------------------------------------------